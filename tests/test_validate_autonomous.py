@@ -0,0 +1,189 @@
+"""
+Block/allow regression table for .claude/hooks/validate-autonomous.py.
+
+Run: python3 -m unittest discover tests
+"""
+import importlib.util
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+HOOK = Path(__file__).resolve().parent.parent / ".claude" / "hooks" / "validate-autonomous.py"
+
+_spec = importlib.util.spec_from_file_location("validate_autonomous", HOOK)
+hook = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hook)
+
+# (command, substring of the expected block reason)
+BLOCKED = [
+    # git push, including flags, quoting and substitutions before the subcommand
+    ("git push", "git push is blocked"),
+    ("git push origin main", "git push is blocked"),
+    ("git -C x push origin", "git push is blocked"),
+    ('git -C "$REPO" push origin main', "git push is blocked"),
+    ('git -C "$(pwd)" push', "git push is blocked"),
+    ("git -C $(pwd) push", "git push is blocked"),
+    ("git -C `pwd` push", "git push is blocked"),
+    ('git --git-dir="$D/.git" push', "git push is blocked"),
+    ('git -c "user.name=x" push', "git push is blocked"),
+    ('git -C "a;b" push', "git push is blocked"),
+    ('git "push"', "git push is blocked"),
+    ("git $(echo push)", "git push is blocked"),
+    ("$(which git) push", "git push is blocked"),
+    ("/usr/bin/git push", "git push is blocked"),
+    ("git --force push", "git push is blocked"),
+    ("git push --force", "force push is blocked"),
+    ("git push -f origin main", "force push is blocked"),
+    ("git push --force-with-lease", "force push is blocked"),
+    # git invoked inside other commands
+    ('bash -c "git push"', "git push is blocked"),
+    ("sh -c 'cd x; git reset --hard'", "reset --hard"),
+    ("$(git push)", "git push is blocked"),
+    ("`git push`", "git push is blocked"),
+    ("(cd x; git push)", "git push is blocked"),
+    ("git status\ngit push", "git push is blocked"),
+    ("ls > out 2>&1 && git push", "git push is blocked"),
+    # inline aliases
+    ("git -c alias.p=push p", "git push is blocked"),
+    ('git -c alias.nuke="reset --hard" nuke', "reset --hard"),
+    ("git -c 'alias.x=!git push' x", "git push is blocked"),
+    # other destructive git operations
+    ("git reset --hard HEAD", "reset --hard"),
+    ('git "reset" --hard', "reset --hard"),
+    ("git -C $(git rev-parse --show-toplevel) reset --hard", "reset --hard"),
+    ("git clean -fd", "git clean -f"),
+    ('git -C "a b" clean -fdx', "git clean -f"),
+    ("git -c a=b clean -xfd", "git clean -f"),
+    ("git checkout .", "git checkout ."),
+    ('git -C "$R" checkout .', "git checkout ."),
+    ("git restore .", "git restore ."),
+    ("git branch -D x", "git branch -D"),
+    ('git -C "$R" branch -D f', "git branch -D"),
+    ("git stash drop", "stash drop/clear"),
+    ('git -C "$R" stash clear', "stash drop/clear"),
+    ("git rebase -i HEAD~2", "interactive git rebase"),
+    ('git -C "$R" rebase -i x', "interactive git rebase"),
+    # remote access, deployment, deletion, privilege escalation, network
+    ("ssh host", "ssh is blocked"),
+    ("cat a | ssh h", "ssh is blocked"),
+    ("scp a b:c", "scp is blocked"),
+    ("rsync a host:b", "rsync to remote hosts"),
+    ("./deploy.sh", "deploy.sh is blocked"),
+    ("deploy production", "deployment commands"),
+    ("rm foo", "rm is blocked"),
+    ("rm", "rm is blocked"),
+    ("echo hi; rm -rf x", "rm is blocked"),
+    ("echo $(rm x)", "rm is blocked"),
+    ("rmdir d", "rmdir is blocked"),
+    ("unlink f", "unlink is blocked"),
+    ("shred f", "shred is blocked"),
+    ("sudo ls", "sudo is blocked"),
+    ("su", "su is blocked"),
+    ("cd x && su", "su is blocked"),
+    ("doas x", "doas is blocked"),
+    ("curl http://x", "curl is blocked"),
+    ("wget x", "wget is blocked"),
+    ("nc host 1", "nc/ncat is blocked"),
+    ("pip install x && curl bad", "curl is blocked"),
+    ('bash -c "pip install x && curl bad"', "curl is blocked"),
+    # docker lifecycle and docker exec payloads
+    ("docker stop c", "docker stop"),
+    ("docker kill c", "docker kill"),
+    ("docker-compose down", "docker-compose down"),
+    ("docker compose down", "docker-compose down"),
+    ("docker exec db psql -c 'DROP TABLE x'", "DROP TABLE"),
+    ("docker exec db psql -c 'Drop Database x'", "DROP TABLE"),
+    ("docker exec db psql -c 'delete from t'", "DELETE FROM"),
+    ("docker exec db psql -c 'TRUNCATE t'", "TRUNCATE"),
+    ("docker exec db psql -c 'alter table t drop column c'", "ALTER TABLE"),
+    ('docker exec db sh -c "cd /app && psql -c \\"drop table x\\""', "DROP TABLE"),
+    ('echo "DROP TABLE x" | docker exec -i db psql', "DROP TABLE"),
+    ("docker exec web python manage.py flush", "manage.py flush"),
+    ("docker exec web python manage.py reset_db", "manage.py reset_db"),
+    ("docker exec web python manage.py dbshell", "manage.py dbshell"),
+    ('echo "python manage.py flush" | docker exec -i web bash', "manage.py flush"),
+    ("printf 'manage.py flush' | docker exec -i web sh", "manage.py flush"),
+]
+
+ALLOWED = [
+    "ls -la",
+    "python surplus.py",
+    "npm test",
+    "pip install curl",
+    "git status",
+    "git log --oneline",
+    "git log | grep push",
+    'git commit -m "push it"',
+    'git commit -m "fix; push later"',
+    'git -C "$R" status',
+    "git -c alias.st=status st",
+    "git status 2>&1 | tee log",
+    "git reset HEAD",
+    "git reset HEAD\necho --hard",
+    "git clean -n",
+    "git checkout main",
+    "git branch -d x",
+    "git stash list",
+    "git rebase main",
+    "git rebase --continue",
+    "rsync -av src/ dest/",
+    "my_ssh_tool",
+    "docker exec web python manage.py migrate",
+    "docker exec db psql -c 'select 1'",
+    "docker exec db psql -c 'drop_thing()'",
+    "docker exec db psql -c 'alter table t add x'",
+    "docker exec c truncate -s 0 log",
+]
+
+
+class ValidateTableTest(unittest.TestCase):
+    def test_blocked(self):
+        for command, reason in BLOCKED:
+            with self.subTest(command=command):
+                result = hook._validate(command)
+                self.assertIsNotNone(result, "expected block")
+                self.assertIn(reason, result)
+
+    def test_allowed(self):
+        for command in ALLOWED:
+            with self.subTest(command=command):
+                self.assertIsNone(hook._validate(command))
+
+
+class HookProcessTest(unittest.TestCase):
+    """End to end through stdin/stdout, with the flags used in settings.local.json."""
+
+    def run_hook(self, payload):
+        return subprocess.run(
+            [sys.executable, "-S", "-I", str(HOOK)],
+            input=payload,
+            capture_output=True,
+            check=False,
+        )
+
+    def test_block_decision_is_json(self):
+        payload = json.dumps({"tool_name": "Bash", "tool_input": {"command": "git push"}}).encode()
+        result = self.run_hook(payload)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(
+            json.loads(result.stdout),
+            {"decision": "block", "reason": "Autonomous mode: git push is blocked. Commit locally only."},
+        )
+
+    def test_allow_and_malformed_input_are_silent(self):
+        for payload in (
+            json.dumps({"tool_name": "Bash", "tool_input": {"command": "ls"}}).encode(),
+            json.dumps({"tool_name": "Write", "tool_input": {"command": "rm x"}}).encode(),
+            b"garbage",
+            b'["Bash"]',
+            b'{"tool_name": "Bash", "tool_input": "x"}',
+        ):
+            with self.subTest(payload=payload):
+                result = self.run_hook(payload)
+                self.assertEqual((result.returncode, result.stdout), (0, b""))
+
+
+if __name__ == "__main__":
+    unittest.main()